@@ -8,14 +8,20 @@ import matplotlib.pyplot as plt
 from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg, NavigationToolbar2Tk
 from matplotlib.figure import Figure
 import matplotlib.patches as patches
+from matplotlib.collections import LineCollection, PatchCollection
 import pandas as pd
 import numpy as np
 from datetime import datetime
 from typing import List, Optional, Dict, Tuple
+import hashlib
 import os
+import pickle
+import queue
+import threading
+from pathlib import Path
 
 from chan_kline_tool import ChanKLineTool
-from kline_data import KLine, MergedKLine
+from kline_data import KLine, MergedKLine, KLineArray
 
 # 设置中文字体
 plt.rcParams['font.sans-serif'] = ['SimHei', 'Microsoft YaHei', 'Arial Unicode MS']
@@ -40,38 +46,40 @@ class DrawingTool:
         """鼠标按下事件"""
         if event.inaxes != self.ax or self.drawing_mode is None:
             return
-        
+
         self.start_point = (event.xdata, event.ydata)
-        
+
+        # 预览图形只创建一次，拖拽过程中复用同一个Artist更新几何
+        if self.drawing_mode == 'line':
+            self.current_artist = self.ax.plot(
+                [self.start_point[0], self.start_point[0]],
+                [self.start_point[1], self.start_point[1]],
+                'r--', alpha=0.7, linewidth=2)[0]
+        elif self.drawing_mode == 'rect':
+            self.current_artist = patches.Rectangle(self.start_point, 0, 0,
+                                   linewidth=2, edgecolor='r',
+                                   facecolor='yellow', alpha=0.3)
+            self.ax.add_patch(self.current_artist)
+
     def on_motion(self, event):
         """鼠标移动事件"""
         if event.inaxes != self.ax or self.drawing_mode is None or self.start_point is None:
             return
-            
-        # 移除临时绘制的图形
-        if self.current_artist:
-            self.current_artist.remove()
-            self.current_artist = None
-            
+
+        if self.current_artist is None:
+            return
+
         end_point = (event.xdata, event.ydata)
-        
+
+        # 只更新预览Artist的几何数据，不重建Artist
         if self.drawing_mode == 'line':
-            # 绘制临时直线
-            line = self.ax.plot([self.start_point[0], end_point[0]], 
-                               [self.start_point[1], end_point[1]], 
-                               'r--', alpha=0.7, linewidth=2)[0]
-            self.current_artist = line
-            
+            self.current_artist.set_data([self.start_point[0], end_point[0]],
+                                         [self.start_point[1], end_point[1]])
         elif self.drawing_mode == 'rect':
-            # 绘制临时矩形
-            width = end_point[0] - self.start_point[0]
-            height = end_point[1] - self.start_point[1]
-            rect = patches.Rectangle(self.start_point, width, height, 
-                                   linewidth=2, edgecolor='r', 
-                                   facecolor='yellow', alpha=0.3)
-            self.ax.add_patch(rect)
-            self.current_artist = rect
-            
+            self.current_artist.set_bounds(self.start_point[0], self.start_point[1],
+                                           end_point[0] - self.start_point[0],
+                                           end_point[1] - self.start_point[1])
+
         self.canvas.draw_idle()
         
     def on_release(self, event):
@@ -129,6 +137,19 @@ class ChanGUIApp:
         self.chan_tool = ChanKLineTool()
         self.original_data = []
         self.merged_data = []
+        self.original_arr: Optional[KLineArray] = None  # 原始K线的列式数组
+        self.merged_arr: Optional[KLineArray] = None    # 合并K线的列式数组
+        self._fractals_cache = None  # 分型检测结果缓存（数据变化时置None）
+        self._pens_cache = None      # 笔计算结果缓存（数据变化时置None）
+        self._marker_artists = []    # 分型/笔/合并信息的Artist，切换显示时只改可见性
+        self._bg = None              # blit用的背景缓存（视图变化时置None）
+        self._tick_labels_cache: Dict[int, List[str]] = {}  # x轴刻度标签缓存（按K线数量）
+        self._idx_strs_cache: Dict[int, List[str]] = {}     # 柱内序号文本缓存（按K线数量）
+        self._load_queue = queue.Queue()  # 后台加载线程向主线程传递结果
+        # 坐标信息模板，切换视图时特化，点击时只做填值
+        self._info_fmt = "K线 {i}: 高={h:.2f}, 低={l:.2f}, 中间价={m:.2f}"
+        self._home_xlim = None  # 绘制完成时的初始视图范围，重置视图时直接恢复
+        self._home_ylim = None
         self.current_view = "original"  # "original" 或 "merged"
         
         # GUI组件
@@ -246,11 +267,30 @@ class ChanGUIApp:
     def setup_drawing_tool(self):
         """设置绘图工具"""
         self.drawing_tool = DrawingTool(self.ax, self.canvas)
-        
-        # 连接鼠标事件
+        self._motion_cid = None  # 仅在绘图模式下挂接的移动事件回调
+
+        # 连接鼠标事件（移动事件在进入绘图模式时才挂接，
+        # 避免普通浏览时每个像素的鼠标移动都进一次Python回调）
         self.canvas.mpl_connect('button_press_event', self.on_click)
-        self.canvas.mpl_connect('motion_notify_event', self.drawing_tool.on_motion)
-        self.canvas.mpl_connect('button_release_event', self.drawing_tool.on_release)
+        self.canvas.mpl_connect('button_release_event', self.on_release)
+
+    def _connect_motion_handler(self):
+        """进入绘图模式时挂接鼠标移动事件"""
+        if self._motion_cid is None:
+            self._motion_cid = self.canvas.mpl_connect(
+                'motion_notify_event', self.drawing_tool.on_motion)
+
+    def _disconnect_motion_handler(self):
+        """退出绘图模式时断开鼠标移动事件"""
+        if self._motion_cid is not None:
+            self.canvas.mpl_disconnect(self._motion_cid)
+            self._motion_cid = None
+
+    def on_release(self, event):
+        """处理鼠标释放事件，绘制完成后断开移动事件回调"""
+        self.drawing_tool.on_release(event)
+        if self.drawing_tool.drawing_mode is None:
+            self._disconnect_motion_handler()
         
     def import_data(self):
         """导入数据"""
@@ -265,62 +305,139 @@ class ChanGUIApp:
         
         if not file_path:
             return
-            
+
+        # 文件读取放到后台线程，避免大文件加载时冻结GUI；
+        # 结果通过队列回传，由主线程轮询处理
+        self.import_btn.config(state='disabled')
+        self.status_label.config(text="⏳ 正在加载数据...", foreground="orange")
+        threading.Thread(target=self._load_worker, args=(file_path,),
+                         daemon=True).start()
+        self.root.after(50, self._poll_load)
+
+    @staticmethod
+    def _dataset_cache_path(file_path):
+        """根据文件内容指纹（前64KB哈希+修改时间）生成磁盘缓存路径"""
+        with open(file_path, 'rb') as f:
+            digest = hashlib.blake2b(f.read(1 << 16)).hexdigest()
+        key = f"{digest}_{os.path.getmtime(file_path)}"
+        cache_dir = Path('~/.cache/chan').expanduser()
+        return cache_dir / f"{key}.pkl"
+
+    def _load_worker(self, file_path):
+        """后台线程：加载数据文件并把结果放入队列
+
+        同一文件再次打开时直接从磁盘缓存反序列化解析结果，
+        跳过Excel/CSV解析。
+        """
         try:
-            # 尝试加载数据
+            cache_path = None
+            try:
+                cache_path = self._dataset_cache_path(file_path)
+                if cache_path.exists():
+                    with open(cache_path, 'rb') as f:
+                        self.chan_tool.original_klines = pickle.load(f)
+                    # 列式数组和统计缓存还描述上一份数据，置None后
+                    # 由validate_data等按需从缓存的K线重建
+                    self.chan_tool._columns = None
+                    self.chan_tool._stats_cache = None
+                    self._load_queue.put((True, None))
+                    return
+            except Exception:
+                # 缓存读取失败不影响正常加载
+                cache_path = None
+
             success = self.chan_tool.load_from_excel(file_path)
-            
-            if success:
-                self.original_data = self.chan_tool.original_klines
-                self.data_loaded = True
-                self.merged = False
-                
-                # 更新状态
-                self.status_label.config(text=f"已导入 {len(self.original_data)} 根K线数据", 
-                                       foreground="green")
-                
-                # 启用相关按钮
-                self.view_original_btn.config(state='normal')
-                self.view_merged_btn.config(state='normal')
-                
-                # 显示原始K线
-                self.show_original()
-                
-            else:
-                messagebox.showerror("错误", "数据导入失败，请检查文件格式")
-                
+
+            if success and cache_path is not None:
+                try:
+                    cache_path.parent.mkdir(parents=True, exist_ok=True)
+                    with open(cache_path, 'wb') as f:
+                        pickle.dump(self.chan_tool.original_klines, f)
+                except Exception:
+                    # 写缓存失败同样不影响本次加载
+                    pass
+
+            self._load_queue.put((success, None))
         except Exception as e:
-            messagebox.showerror("错误", f"导入数据时出错: {str(e)}")
-            
+            self._load_queue.put((False, e))
+
+    def _poll_load(self):
+        """主线程：轮询加载结果，完成后更新界面"""
+        try:
+            success, error = self._load_queue.get_nowait()
+        except queue.Empty:
+            self.root.after(50, self._poll_load)
+            return
+
+        self.import_btn.config(state='normal')
+
+        if error is not None:
+            self.status_label.config(text="数据导入失败", foreground="red")
+            messagebox.showerror("错误", f"导入数据时出错: {str(error)}")
+            return
+
+        if success:
+            self.original_data = self.chan_tool.original_klines
+            # 一次性转成列式数组，后续重绘直接用数组切片
+            self.original_arr = KLineArray.from_klines(self.original_data)
+            self.merged_arr = None
+            self._fractals_cache = None
+            self._pens_cache = None
+            self.data_loaded = True
+            self.merged = False
+
+            # 更新状态
+            self.status_label.config(text=f"已导入 {len(self.original_data)} 根K线数据",
+                                   foreground="green")
+
+            # 启用相关按钮
+            self.view_original_btn.config(state='normal')
+            self.view_merged_btn.config(state='normal')
+
+            # 显示原始K线
+            self.show_original()
+        else:
+            self.status_label.config(text="数据导入失败", foreground="red")
+            messagebox.showerror("错误", "数据导入失败，请检查文件格式")
+
 
     def draw_candlestick(self, ax, times, highs, lows, title, color_scheme='original'):
         """绘制K线柱状图（只显示最高价和最低价之间的柱状）"""
         ax.clear()
-        
-        # 绘制K线柱状
-        for i, (time, high, low) in enumerate(zip(times, highs, lows)):
-            if color_scheme == 'original':
-                # 原始K线用蓝色
-                color = 'lightblue'
-                edge_color = 'blue'
-            else:
-                # 合并K线用绿色
-                color = 'lightgreen'
-                edge_color = 'darkgreen'
-            
-            # 绘制从最低价到最高价的柱状图
-            bar_width = 0.6
-            bar_height = high - low
-            
-            rect = patches.Rectangle((time - bar_width/2, low), bar_width, bar_height,
-                                   linewidth=2, edgecolor=edge_color, 
-                                   facecolor=color, alpha=0.8)
-            ax.add_patch(rect)
-            
-            # 在柱状图中央显示序号
-            mid_price = (high + low) / 2
-            ax.text(time, mid_price, str(i+1), 
-                   ha='center', va='center', fontsize=8, fontweight='bold', color='black')
+
+        if color_scheme == 'original':
+            # 原始K线用蓝色
+            color = 'lightblue'
+            edge_color = 'blue'
+        else:
+            # 合并K线用绿色
+            color = 'lightgreen'
+            edge_color = 'darkgreen'
+
+        n = len(times)
+        bar_width = 0.6
+
+        # 批量构建所有柱状矩形，用单个PatchCollection一次性提交，
+        # 避免逐根K线创建独立Artist（大数据量时绘制开销随之线性增长）
+        highs_arr = np.asarray(highs, dtype=np.float64)
+        lows_arr = np.asarray(lows, dtype=np.float64)
+        heights = np.subtract(highs_arr, lows_arr)
+        xs = np.arange(n) - bar_width / 2
+
+        rects = [patches.Rectangle((x, low), bar_width, height)
+                 for x, low, height in zip(xs, lows_arr, heights)]
+        pc = PatchCollection(rects, facecolors=color, edgecolors=edge_color,
+                             linewidths=2, alpha=0.8)
+        ax.add_collection(pc)
+
+        # 在柱状图中央显示序号（K线过多时序号重叠且拖慢绘制，跳过）
+        if n <= 200:
+            mids = (highs_arr + lows_arr) / 2
+            idx_strs = self._idx_strs_cache.setdefault(
+                n, [str(i + 1) for i in range(n)])
+            for i in range(n):
+                ax.text(i, mids[i], idx_strs[i],
+                        ha='center', va='center', fontsize=8, fontweight='bold', color='black')
         
         # 设置图表属性
         ax.set_title(title, fontsize=14, fontweight='bold')
@@ -331,12 +448,21 @@ class ChanGUIApp:
         # 设置x轴
         ax.set_xlim(-0.5, len(times) - 0.5)
         if len(times) > 0:
-            ax.set_xticks(range(len(times)))
-            ax.set_xticklabels([f'K{i+1}' for i in range(len(times))], rotation=45)
+            if n <= 200:
+                ax.set_xticks(range(n))
+                # 刻度标签按K线数量缓存，重绘时不再重新格式化字符串
+                tick_labels = self._tick_labels_cache.setdefault(
+                    n, [f'K{i+1}' for i in range(n)])
+                ax.set_xticklabels(tick_labels, rotation=45)
+            else:
+                # K线太多时逐根刻度只会挤成一团，稀疏取10个刻度即可
+                tick_idx = np.linspace(0, n - 1, 10, dtype=int)
+                ax.set_xticks(tick_idx)
+                ax.set_xticklabels([f'K{i+1}' for i in tick_idx], rotation=45)
             
             # 设置y轴范围，确保所有数据可见
-            y_min = min(lows) * 0.98
-            y_max = max(highs) * 1.02
+            y_min = float(lows_arr.min()) * 0.98
+            y_max = float(highs_arr.max()) * 1.02
             ax.set_ylim(y_min, y_max)
         
         return ax
@@ -347,22 +473,26 @@ class ChanGUIApp:
             return
             
         self.current_view = "original"
-        
-        # 准备数据
+        self._info_fmt = "K线 {i}: 高={h:.2f}, 低={l:.2f}, 中间价={m:.2f}"
+
+        # 准备数据（列式数组，免去逐对象属性查找）
         times = list(range(len(self.original_data)))
-        highs = [k.high for k in self.original_data]
-        lows = [k.low for k in self.original_data]
-        
+        highs = self.original_arr.high
+        lows = self.original_arr.low
+
         # 绘制图表
-        self.draw_candlestick(self.ax, times, highs, lows, 
+        self.draw_candlestick(self.ax, times, highs, lows,
                             f"原始K线图 (共{len(self.original_data)}根)", 'original')
         
         # 清除之前的用户绘制
         self.drawing_tool.user_drawings.clear()
         
-        # 强制刷新canvas
+        # 刷新canvas（draw_idle让Tk自行合并重绘请求，
+        # 不再用flush_events强制同步往返事件循环）
         self.canvas.draw_idle()
-        self.canvas.flush_events()
+
+        self._remember_home_view()
+        self._setup_blit_background()
         
     def show_merged(self):
         """显示合并后的K线"""
@@ -376,7 +506,11 @@ class ChanGUIApp:
                 success = self.chan_tool.merge_klines()
                 if success:
                     self.merged_data = self.chan_tool.merged_klines
+                    self.merged_arr = KLineArray.from_klines(self.merged_data)
                     self.merged = True
+                    # 合并结果变化，作废分型/笔缓存
+                    self._fractals_cache = None
+                    self._pens_cache = None
                     
                     # 更新状态
                     stats = self.chan_tool.get_statistics()
@@ -392,103 +526,142 @@ class ChanGUIApp:
                 return
             
         self.current_view = "merged"
-        
-        # 准备数据
+        self._info_fmt = "K线 {i}: 高={h:.2f}, 低={l:.2f}, 中间价={m:.2f}, 合并数={c}"
+
+        # 准备数据（列式数组，免去逐对象属性查找）
         times = list(range(len(self.merged_data)))
-        highs = [k.high for k in self.merged_data]
-        lows = [k.low for k in self.merged_data]
+        highs = self.merged_arr.high
+        lows = self.merged_arr.low
         
         # 绘制图表
         self.draw_candlestick(self.ax, times, highs, lows, 
                             f"合并后K线图 (共{len(self.merged_data)}根)", 'merged')
         
-        # 添加分型标记和笔的连线（如果启用了标记显示）
-        if self.show_markers:
-            self.add_fractal_markers()
-            self.add_pen_lines()
-        
-        # 添加合并信息标记
+        # 添加分型标记、笔的连线和合并信息标记，
+        # Artist统一记录下来，切换显示时只改可见性而不重建图表
+        self._marker_artists = []
+        self.add_fractal_markers()
+        self.add_pen_lines()
         self.add_merge_info()
-        
+
+        for artist in self._marker_artists:
+            artist.set_visible(self.show_markers)
+
         self.canvas.draw()
-        
+
+        self._remember_home_view()
+        self._setup_blit_background()
+        
+    def _ensure_fractals_and_pens(self):
+        """检测分型并计算笔，结果缓存到下次数据变化为止"""
+        if self._fractals_cache is None:
+            self._fractals_cache = self.chan_tool.visualizer.detect_fractals(self.merged_data)
+            self._pens_cache = self.chan_tool.visualizer.calculate_pens(self._fractals_cache)
+
     def add_fractal_markers(self):
         """添加分型标记"""
-        fractals = self.chan_tool.visualizer.detect_fractals(self.merged_data)
-        pens = self.chan_tool.visualizer.calculate_pens(fractals)
-        
-        # 获取被笔连接的分型
-        used_fractals = getattr(self.chan_tool.visualizer, 'used_fractals', set())
-        
-        for fractal in fractals:
-            # 只显示被笔连接的分型
-            if fractal in used_fractals:
-                time_index = fractal.index
-                price = fractal.price
-                
-                if fractal.type == 'top':
-                    # 顶分型用红色向下三角
-                    self.ax.scatter(time_index, price, marker='v', s=200, c='red', 
-                                  edgecolors='darkred', linewidth=2, zorder=5,
-                                  label='顶分型' if fractal == list(used_fractals)[0] else "")
-                else:
-                    # 底分型用绿色向上三角
-                    self.ax.scatter(time_index, price, marker='^', s=200, c='green', 
-                                  edgecolors='darkgreen', linewidth=2, zorder=5,
-                                  label='底分型' if fractal == list(used_fractals)[0] else "")
+        self._ensure_fractals_and_pens()
+        fractals = self._fractals_cache
+
+        # 获取被笔连接的分型（只显示这些分型）
+        # used_fractals是按分型列表下标对齐的布尔数组
+        used_mask = getattr(self.chan_tool.visualizer, 'used_fractals', None)
+        if used_mask is None:
+            used = []
+        else:
+            used = [f for f, u in zip(fractals, used_mask) if u]
+
+        # 顶/底各一次scatter批量绘制，并各自携带一个图例标签，
+        # 取代逐分型scatter和每次迭代的list(used_fractals)[0]判断
+        tops = [(f.index, f.price) for f in used if f.type == 'top']
+        bottoms = [(f.index, f.price) for f in used if f.type == 'bottom']
+
+        if tops:
+            tops_idx, tops_price = np.array(tops).T
+            # 顶分型用红色向下三角
+            artist = self.ax.scatter(tops_idx, tops_price, marker='v', s=200, c='red',
+                                     edgecolors='darkred', linewidth=2, zorder=5,
+                                     label='顶分型')
+            self._marker_artists.append(artist)
+        if bottoms:
+            bottoms_idx, bottoms_price = np.array(bottoms).T
+            # 底分型用绿色向上三角
+            artist = self.ax.scatter(bottoms_idx, bottoms_price, marker='^', s=200, c='green',
+                                     edgecolors='darkgreen', linewidth=2, zorder=5,
+                                     label='底分型')
+            self._marker_artists.append(artist)
                               
     def add_pen_lines(self):
         """添加笔的连线"""
-        pens = self.chan_tool.visualizer.calculate_pens()
-        
-        for i, pen in enumerate(pens):
-            start_index = pen.start_fractal.index
-            end_index = pen.end_fractal.index
-            start_price = pen.start_price
-            end_price = pen.end_price
-            
-            # 绘制笔的连线
-            self.ax.plot([start_index, end_index], [start_price, end_price],
-                        'k-', linewidth=3, alpha=0.8, zorder=4,
-                        label='笔' if i == 0 else "")
-            
-            # 在笔的中点添加方向标记
-            mid_index = (start_index + end_index) / 2
-            mid_price = (start_price + end_price) / 2
-            
-            direction_symbol = '↗' if pen.direction == 'up' else '↘'
-            self.ax.annotate(direction_symbol, xy=(mid_index, mid_price), 
-                           fontsize=14, ha='center', va='center',
-                           color='black', fontweight='bold', zorder=6)
+        self._ensure_fractals_and_pens()
+        pens = self._pens_cache
+
+        if not pens:
+            return
+
+        # 所有笔的线段合成一个LineCollection一次性提交，
+        # 而不是每笔一个Line2D Artist
+        segments = np.array([[(pen.start_fractal.index, pen.start_price),
+                              (pen.end_fractal.index, pen.end_price)]
+                             for pen in pens])
+        lc = LineCollection(segments, colors='k', linewidths=3, alpha=0.8,
+                            zorder=4, label='笔')
+        self.ax.add_collection(lc)
+        self._marker_artists.append(lc)
+
+        # 方向标记仍需逐个文本Artist，笔太多时跳过以免拖慢绘制
+        if len(pens) <= 100:
+            mids = segments.mean(axis=1)
+            for pen, (mid_index, mid_price) in zip(pens, mids):
+                direction_symbol = '↗' if pen.direction == 'up' else '↘'
+                annotation = self.ax.annotate(direction_symbol, xy=(mid_index, mid_price),
+                               fontsize=14, ha='center', va='center',
+                               color='black', fontweight='bold', zorder=6)
+                self._marker_artists.append(annotation)
                            
     def add_merge_info(self):
         """添加合并信息标记"""
-        for i, k in enumerate(self.merged_data):
-            if k.original_count > 1:
-                # 在合并的K线上方显示合并数量
-                self.ax.annotate(f'×{k.original_count}', 
-                               xy=(i, k.high), 
-                               xytext=(5, 10), 
-                               textcoords='offset points',
-                               fontsize=10, 
-                               color='purple',
-                               fontweight='bold',
-                               bbox=dict(boxstyle='round,pad=0.3', 
-                                       facecolor='yellow', alpha=0.8))
+        arr = self.merged_arr
+        counts = arr.original_count
+
+        # 先用掩码筛出真正发生过合并的K线，只给这部分创建标注
+        idxs = np.nonzero(counts > 1)[0]
+
+        # 标注太多时只保留合并数最大的前50个，其余的信息可通过点击查看
+        if len(idxs) > 50:
+            top_order = np.argsort(counts[idxs])[::-1]
+            idxs = idxs[top_order[:50]]
+
+        for i in idxs:
+            # 在合并的K线上方显示合并数量
+            annotation = self.ax.annotate(f'×{counts[i]}',
+                           xy=(i, arr.high[i]),
+                           xytext=(5, 10),
+                           textcoords='offset points',
+                           fontsize=10,
+                           color='purple',
+                           fontweight='bold',
+                           bbox=dict(boxstyle='round,pad=0.3',
+                                   facecolor='yellow', alpha=0.8))
+            self._marker_artists.append(annotation)
         
     def start_draw_line(self):
         """开始画线模式"""
         self.drawing_tool.set_drawing_mode('line')
+        self._connect_motion_handler()
         self.status_label.config(text="画线模式：点击并拖拽绘制直线", foreground="orange")
-        
+
     def start_draw_rect(self):
         """开始画框模式"""
         self.drawing_tool.set_drawing_mode('rect')
+        self._connect_motion_handler()
         self.status_label.config(text="画框模式：点击并拖拽绘制矩形", foreground="orange")
         
     def clear_drawings(self):
         """清除用户绘制的标记"""
         self.drawing_tool.clear_drawings()
+        # 画面内容已变化，丢弃blit背景，下次点击重新抓取
+        self._bg = None
         self.status_label.config(text="已清除所有用户标记", foreground="blue")
     
     def toggle_markers(self):
@@ -500,12 +673,13 @@ class ChanGUIApp:
         else:
             self.toggle_markers_btn.config(text="👁️ 显示标记")
             self.status_label.config(text="标记已隐藏", foreground="blue")
-        
-        # 重新绘制当前视图
-        if self.current_view == "merged":
-            self.show_merged()
-        elif self.current_view == "original":
-            self.show_original()
+
+        # 只切换已有Artist的可见性，不重建整张图
+        for artist in self._marker_artists:
+            artist.set_visible(self.show_markers)
+        # 画面内容已变化，丢弃blit背景，下次点击重新抓取
+        self._bg = None
+        self.canvas.draw_idle()
     
     def on_click(self, event):
         """处理鼠标点击事件"""
@@ -529,31 +703,25 @@ class ChanGUIApp:
     
     def find_nearest_kline(self, x_click, y_click):
         """查找最近的K线并显示坐标信息"""
-        if self.current_view == "original" and self.original_data:
-            klines = self.original_data
-            times = list(range(len(klines)))
-        elif self.current_view == "merged" and self.merged_data:
-            klines = self.merged_data
-            times = list(range(len(klines)))
+        if self.current_view == "original" and self.original_arr is not None:
+            arr = self.original_arr
+        elif self.current_view == "merged" and self.merged_arr is not None:
+            arr = self.merged_arr
         else:
             return
-        
-        # 找到最近的K线索引
-        if len(times) == 0:
+
+        if len(arr) == 0:
             return
-        
-        nearest_index = min(range(len(times)), key=lambda i: abs(times[i] - x_click))
-        
-        # 获取K线信息
-        kline = klines[nearest_index]
-        
-        # 显示坐标信息
-        if self.current_view == "original":
-            info_text = f"K线 {nearest_index + 1}: 高={kline.high:.2f}, 低={kline.low:.2f}, 中间价={kline.mid_price:.2f}"
-        else:
-            info_text = f"K线 {nearest_index + 1}: 高={kline.high:.2f}, 低={kline.low:.2f}, 中间价={kline.mid_price:.2f}"
-            if hasattr(kline, 'original_count'):
-                info_text += f", 合并数={kline.original_count}"
+
+        # K线横坐标就是其序号，最近的K线即点击位置四舍五入后截断到有效范围
+        nearest_index = max(0, min(len(arr) - 1, int(round(x_click))))
+
+        # 显示坐标信息（模板随视图特化，这里只填值）
+        info_text = self._info_fmt.format(i=nearest_index + 1,
+                                          h=arr.high[nearest_index],
+                                          l=arr.low[nearest_index],
+                                          m=arr.mid_price[nearest_index],
+                                          c=arr.original_count[nearest_index])
         
         self.coordinate_label.config(text=info_text)
         
@@ -570,51 +738,76 @@ class ChanGUIApp:
                 # 如果无法移除，则隐藏
                 self.highlight_artist.set_visible(False)
         
-        # 获取当前数据
-        if self.current_view == "original" and self.original_data:
-            klines = self.original_data
-        elif self.current_view == "merged" and self.merged_data:
-            klines = self.merged_data
+        # 获取当前数据（列式数组）
+        if self.current_view == "original" and self.original_arr is not None:
+            arr = self.original_arr
+        elif self.current_view == "merged" and self.merged_arr is not None:
+            arr = self.merged_arr
         else:
             return
-        
-        if index >= len(klines):
+
+        if index >= len(arr):
             return
-        
-        kline = klines[index]
-        
+
+        low = arr.low[index]
+
         # 绘制高亮框
         bar_width = 0.8
-        bar_height = kline.high - kline.low
-        
-        highlight_rect = patches.Rectangle((index - bar_width/2, kline.low), 
+        bar_height = arr.high[index] - low
+
+        # animated=True让常规绘制跳过高亮框，由blit单独绘制
+        highlight_rect = patches.Rectangle((index - bar_width/2, low),
                                          bar_width, bar_height,
-                                         linewidth=3, edgecolor='yellow', 
-                                         facecolor='none', alpha=0.8)
+                                         linewidth=3, edgecolor='yellow',
+                                         facecolor='none', alpha=0.8,
+                                         animated=True)
         self.ax.add_patch(highlight_rect)
         self.highlight_artist = highlight_rect
-        
-        self.canvas.draw_idle()
+
+        # blit：恢复缓存背景后只绘制高亮框，避免整图重新栅格化
+        if self._bg is None:
+            self.canvas.draw()
+            self._bg = self.canvas.copy_from_bbox(self.ax.bbox)
+        self.canvas.restore_region(self._bg)
+        self.ax.draw_artist(highlight_rect)
+        self.canvas.blit(self.ax.bbox)
+
+    def _invalidate_blit_background(self, ax=None):
+        """视图（缩放/平移/重绘）变化后作废blit背景缓存"""
+        self._bg = None
+
+    def _setup_blit_background(self):
+        """重绘后重置blit背景并挂接视图变化回调（ax.clear会清掉旧回调）"""
+        self._bg = None
+        self.ax.callbacks.connect('xlim_changed', self._invalidate_blit_background)
+        self.ax.callbacks.connect('ylim_changed', self._invalidate_blit_background)
     
+    def _remember_home_view(self):
+        """记录绘制完成时的坐标范围，供重置/适应窗口直接恢复"""
+        self._home_xlim = self.ax.get_xlim()
+        self._home_ylim = self.ax.get_ylim()
+
     def reset_view(self):
         """重置视图到初始状态"""
         if not self.data_loaded:
             return
-        
-        # 重新绘制当前视图
-        if self.current_view == "merged":
-            self.show_merged()
-        elif self.current_view == "original":
-            self.show_original()
-    
+
+        # 只恢复坐标范围，不重建任何Artist
+        if self._home_xlim is not None:
+            self.ax.set_xlim(self._home_xlim)
+            self.ax.set_ylim(self._home_ylim)
+            self.canvas.draw_idle()
+
     def fit_to_window(self):
         """适应窗口大小"""
         if not self.data_loaded:
             return
-        
-        self.ax.relim()
-        self.ax.autoscale()
-        self.canvas.draw()
+
+        # 数据范围在绘制时已经算好，直接恢复即可，无需relim/autoscale遍历Artist
+        if self._home_xlim is not None:
+            self.ax.set_xlim(self._home_xlim)
+            self.ax.set_ylim(self._home_ylim)
+            self.canvas.draw_idle()
 
 
 def main():
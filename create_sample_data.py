@@ -1,57 +1,48 @@
 """
 创建GUI工具测试用的示例数据
 """
+import numpy as np
 import pandas as pd
-from datetime import datetime, timedelta
-import random
+from datetime import datetime
 
 def create_sample_excel():
     """创建示例Excel文件用于GUI工具测试"""
-    
-    # 生成测试数据
-    data = []
-    base_price = 100.0
+
+    # 生成测试数据（整列向量化生成，K线数量大时也能瞬间完成）
+    n = 50
+    rng = np.random.default_rng()
     start_time = datetime(2024, 1, 1, 9, 0)
-    
-    # 生成50根K线数据，包含一些明显的包含关系
-    for i in range(50):
-        current_time = start_time + timedelta(minutes=i*5)
-        
-        # 模拟价格波动
-        price_change = random.uniform(-1.5, 1.5)
-        base_price += price_change
-        
-        # 生成高低价，确保有一些包含关系
-        if i % 8 == 0:  # 每8根K线制造一个包含关系
-            # 创建被包含的小K线
-            price_range = random.uniform(0.3, 0.8)
-        else:
-            # 正常K线
-            price_range = random.uniform(0.8, 2.0)
-        
-        high_price = base_price + price_range / 2
-        low_price = base_price - price_range / 2
-        
-        data.append({
-            'timestamp': current_time,
-            'high': round(high_price, 2),
-            'low': round(low_price, 2)
-        })
-        
-        # 轻微调整基准价格
-        base_price += random.uniform(-0.3, 0.3)
-    
+
+    # 模拟价格波动：每根K线一次主波动，收尾再加一次轻微漂移
+    price_changes = rng.uniform(-1.5, 1.5, size=n)
+    drifts = rng.uniform(-0.3, 0.3, size=n)
+    bases = (100.0 + np.cumsum(price_changes)
+             + np.concatenate(([0.0], np.cumsum(drifts)[:-1])))
+
+    # 每8根K线制造一个被包含的小K线，其余为正常波动范围
+    price_ranges = np.where(np.arange(n) % 8 == 0,
+                            rng.uniform(0.3, 0.8, size=n),
+                            rng.uniform(0.8, 2.0, size=n))
+
+    highs = np.round(bases + price_ranges / 2, 2)
+    lows = np.round(bases - price_ranges / 2, 2)
+    timestamps = pd.date_range(start_time, periods=n, freq='5min')
+
     # 创建DataFrame并保存
-    df = pd.DataFrame(data)
+    df = pd.DataFrame({
+        'timestamp': timestamps,
+        'high': highs,
+        'low': lows,
+    })
     filename = "GUI测试数据.xlsx"
     df.to_excel(filename, index=False)
-    
+
     print(f"✅ 已创建示例数据文件: {filename}")
-    print(f"📊 包含 {len(data)} 根K线数据")
-    print(f"🕐 时间范围: {data[0]['timestamp']} 到 {data[-1]['timestamp']}")
-    print(f"💰 价格范围: {min(d['low'] for d in data):.2f} 到 {max(d['high'] for d in data):.2f}")
-    
+    print(f"📊 包含 {n} 根K线数据")
+    print(f"🕐 时间范围: {timestamps[0]} 到 {timestamps[-1]}")
+    print(f"💰 价格范围: {lows.min():.2f} 到 {highs.max():.2f}")
+
     return filename
 
 if __name__ == "__main__":
-    create_sample_excel()
\ No newline at end of file
+    create_sample_excel()
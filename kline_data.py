@@ -5,10 +5,16 @@ from dataclasses import dataclass
 from typing import List, Optional
 from datetime import datetime
 
+import numpy as np
 
-@dataclass
+
+@dataclass(slots=True)
 class KLine:
-    """简化的K线数据结构 - 只包含时间、最高价、最低价"""
+    """简化的K线数据结构 - 只包含时间、最高价、最低价
+
+    slots=True去掉每个实例的__dict__，几十万根K线时内存约省一半，
+    属性访问也比字典查找更快。
+    """
     timestamp: datetime  # 时间戳
     high: float         # 最高价
     low: float          # 最低价
@@ -27,7 +33,7 @@ class KLine:
         return f"KLine({self.timestamp}, H:{self.high}, L:{self.low}, Mid:{self.mid_price:.2f})"
 
 
-@dataclass
+@dataclass(slots=True)
 class MergedKLine:
     """合并后的K线数据结构"""
     start_time: datetime    # 开始时间
@@ -42,4 +48,31 @@ class MergedKLine:
         return (self.high + self.low) / 2
     
     def __str__(self):
-        return f"MergedKLine({self.start_time}-{self.end_time}, H:{self.high}, L:{self.low}, Mid:{self.mid_price:.2f}, Count:{self.original_count})"
\ No newline at end of file
+        return f"MergedKLine({self.start_time}-{self.end_time}, H:{self.high}, L:{self.low}, Mid:{self.mid_price:.2f}, Count:{self.original_count})"
+
+
+@dataclass
+class KLineArray:
+    """K线数据的列式(SoA)表示，供绘图等批量计算使用
+
+    按属性访问Python对象列表在每次重绘时都要逐个做属性查找，
+    这里在数据加载时一次性转成连续的NumPy数组，后续读取就是O(1)切片。
+    """
+    high: np.ndarray        # 最高价数组
+    low: np.ndarray         # 最低价数组
+    mid_price: np.ndarray   # 中间价数组
+    original_count: np.ndarray  # 原始K线数量数组（原始K线恒为1）
+
+    @classmethod
+    def from_klines(cls, klines: List) -> "KLineArray":
+        """从KLine/MergedKLine对象列表构建列式数组"""
+        n = len(klines)
+        highs = np.fromiter((k.high for k in klines), dtype=np.float64, count=n)
+        lows = np.fromiter((k.low for k in klines), dtype=np.float64, count=n)
+        counts = np.fromiter((getattr(k, 'original_count', 1) for k in klines),
+                             dtype=np.int64, count=n)
+        return cls(high=highs, low=lows, mid_price=(highs + lows) / 2,
+                   original_count=counts)
+
+    def __len__(self):
+        return len(self.high)
\ No newline at end of file
@@ -2,107 +2,126 @@
 缠论K线合并核心逻辑
 根据图片内容实现完整的K线合并算法
 """
-from typing import List, Optional, Tuple
-from kline_data import KLine, MergedKLine
+from typing import List, Tuple
 from datetime import datetime
 
+import numpy as np
+
+from kline_data import KLine, MergedKLine
+
+try:
+    from numba import njit
+except ImportError:
+    # numba是可选依赖，缺失时合并核心退化为纯Python执行
+    def njit(*args, **kwargs):
+        def wrapper(func):
+            return func
+        return wrapper
+
+
+@njit(cache=True)
+def _merge_core(highs, lows):
+    """K线合并的核心状态机（可被numba即时编译为原生代码）
+
+    输入为最高价/最低价数组，输出为每根合并K线的
+    (起始下标, 结束下标, 最高价, 最低价, 合并数量)五个数组，
+    以及逐根的分型类型数组(0=无, 1=顶, 2=底)。
+    逻辑与原纯Python循环逐步对应：只处理当前K线包含下一根的情形，
+    趋势方向由上一根已提交合并K线的高点决定。
+    分型在合并的同一趟内确认：每提交一根合并K线，
+    其前一根的左右邻居即齐备，立刻判定，省去对结果的二次扫描。
+    """
+    n = highs.shape[0]
+    starts = np.empty(n, dtype=np.int64)
+    ends = np.empty(n, dtype=np.int64)
+    out_high = np.empty(n, dtype=np.float64)
+    out_low = np.empty(n, dtype=np.float64)
+    counts = np.empty(n, dtype=np.int64)
+    ftypes = np.zeros(n, dtype=np.int8)
+
+    m = 0
+    cur_start = 0
+    cur_end = 0
+    cur_high = highs[0]
+    cur_low = lows[0]
+    cur_count = 1
+    prev_high = 0.0
+    has_prev = False
+
+    for i in range(1, n):
+        h = highs[i]
+        l = lows[i]
+
+        if cur_high >= h and cur_low <= l:
+            # 无分支选择趋势方向：up为0/1权重，
+            # 高低点用算术混合max/min代替if/else，
+            # 在JIT内编译为条件传送，随机行情下不付分支预测失败的代价
+            up = 1.0 if (not has_prev) or cur_high >= prev_high else 0.0
+            cur_high = up * max(cur_high, h) + (1.0 - up) * min(cur_high, h)
+            cur_low = up * max(cur_low, l) + (1.0 - up) * min(cur_low, l)
+            cur_end = i
+            cur_count += 1
+        else:
+            starts[m] = cur_start
+            ends[m] = cur_end
+            out_high[m] = cur_high
+            out_low[m] = cur_low
+            counts[m] = cur_count
+            m += 1
+            if m >= 3:
+                j = m - 2
+                if (out_high[j] > out_high[j - 1] and out_high[j] > out_high[j + 1] and
+                        out_low[j] > out_low[j - 1] and out_low[j] > out_low[j + 1]):
+                    ftypes[j] = 1
+                elif (out_high[j] < out_high[j - 1] and out_high[j] < out_high[j + 1] and
+                        out_low[j] < out_low[j - 1] and out_low[j] < out_low[j + 1]):
+                    ftypes[j] = 2
+            prev_high = cur_high
+            has_prev = True
+            cur_start = i
+            cur_end = i
+            cur_high = h
+            cur_low = l
+            cur_count = 1
+
+    starts[m] = cur_start
+    ends[m] = cur_end
+    out_high[m] = cur_high
+    out_low[m] = cur_low
+    counts[m] = cur_count
+    m += 1
+    if m >= 3:
+        j = m - 2
+        if (out_high[j] > out_high[j - 1] and out_high[j] > out_high[j + 1] and
+                out_low[j] > out_low[j - 1] and out_low[j] > out_low[j + 1]):
+            ftypes[j] = 1
+        elif (out_high[j] < out_high[j - 1] and out_high[j] < out_high[j + 1] and
+                out_low[j] < out_low[j - 1] and out_low[j] < out_low[j + 1]):
+            ftypes[j] = 2
+
+    return starts[:m], ends[:m], out_high[:m], out_low[:m], counts[:m], ftypes[:m]
+
 
 class KLineMerger:
     """缠论K线合并工具类"""
     
     def __init__(self):
         self.debug = False
+        # 最近一次合并时同趟确认的分型列表：(下标, 类型, 合并K线)
+        self.fractals: List[Tuple[int, str, MergedKLine]] = []
     
     def set_debug(self, debug: bool):
         """设置调试模式"""
         self.debug = debug
     
-    def _log(self, message: str):
-        """调试日志输出"""
-        if self.debug:
-            print(f"[DEBUG] {message}")
-    
-    def _has_inclusion_relationship(self, k1: MergedKLine, k2: MergedKLine) -> Tuple[bool, str]:
-        """
-        判断两根K线是否存在包含关系
-        新规则：当第n根K线的最高点大于等于第n+1或n-1根K线的最高点，
-        且最低点小于等于第n+1或n-1根K线的最低点时，定义n与n+1或n-1存在包含关系
-        
-        返回: (是否存在包含关系, 包含类型)
-        包含类型: 'k1_contains_k2' 或 'k2_contains_k1' 或 'none'
-        """
-        # 按照新规则：k1包含k2的条件
-        k1_contains_k2 = (k1.high >= k2.high and k1.low <= k2.low)
-        # k2包含k1的条件
-        k2_contains_k1 = (k2.high >= k1.high and k2.low <= k1.low)
-        
-        if k1_contains_k2:
-            self._log(f"发现包含关系: K1({k1.high},{k1.low}) 包含 K2({k2.high},{k2.low})")
-            return True, 'k1_contains_k2'
-        elif k2_contains_k1:
-            self._log(f"发现包含关系: K2({k2.high},{k2.low}) 包含 K1({k1.high},{k1.low})")
-            return True, 'k2_contains_k1'
-        else:
-            return False, 'none'
-    
-    def _merge_inclusion_relationship(self, k1: MergedKLine, k2: MergedKLine, trend_direction: str) -> MergedKLine:
-        """
-        处理包含关系的合并
-        trend_direction: 'up'(上升趋势) 或 'down'(下降趋势)
-        
-        上升趋势：选择两根K线最高点中的较高点作为合并后的MaxGi，
-                选择两根K线最低点中的较高点作为合并后的MaxDi
-        下降趋势：选择两根K线最高点中的较低点作为合并后的MaxGi，
-                选择两根K线最低点中的较低点作为合并后的MaxDi
-        """
-        if trend_direction == 'up':
-            # 上升趋势
-            merged_high = max(k1.high, k2.high)
-            merged_low = max(k1.low, k2.low)
-            self._log(f"上升趋势合并: High=max({k1.high},{k2.high})={merged_high}, Low=max({k1.low},{k2.low})={merged_low}")
-        else:
-            # 下降趋势
-            merged_high = min(k1.high, k2.high)
-            merged_low = min(k1.low, k2.low)
-            self._log(f"下降趋势合并: High=min({k1.high},{k2.high})={merged_high}, Low=min({k1.low},{k2.low})={merged_low}")
-        
-        return MergedKLine(
-            start_time=k1.start_time,
-            end_time=k2.end_time,
-            high=merged_high,
-            low=merged_low,
-            original_count=k1.original_count + k2.original_count
-        )
-    
-    def _determine_trend_direction(self, current_k: MergedKLine, next_k: MergedKLine, merged_klines: List[MergedKLine]) -> str:
-        """
-        确定当前的趋势方向
-        新规则：当第n根K线与n+1根K线存在包含关系，
-        如果n的最高点大于等于n-1的最高点，称n-1、n、n+1根K线向上；
-        相反如果n的最低点小于等于n-1的最低点，称n-1、n、n+1根K线向下
+    def _log(self, template: str, *args):
+        """调试日志输出（延迟格式化）
+
+        调用方传模板和参数而不是现成的f-string，
+        debug关闭时只付一次元组打包的代价，不做任何浮点→字符串格式化。
         """
-        if len(merged_klines) == 0:
-            return 'up'  # 默认上升趋势
-        
-        # 获取前一根K线（n-1）
-        prev_k = merged_klines[-1] if merged_klines else None
-        
-        if prev_k is None:
-            return 'up'  # 默认上升趋势
-        
-        # 按照新规则判断趋势方向
-        if current_k.high >= prev_k.high:
-            self._log(f"趋势向上: 当前K线最高点({current_k.high}) >= 前一根K线最高点({prev_k.high})")
-            return 'up'
-        elif current_k.low <= prev_k.low:
-            self._log(f"趋势向下: 当前K线最低点({current_k.low}) <= 前一根K线最低点({prev_k.low})")
-            return 'down'
-        else:
-            # 如果既不满足向上也不满足向下的条件，则按照最高点比较
-            if current_k.high > prev_k.high:
-                return 'up'
-            else:
-                return 'down'
+        if self.debug:
+            print("[DEBUG] " + (template % args if args else template))
     
     def _kline_to_merged(self, kline: KLine) -> MergedKLine:
         """将单根K线转换为MergedKLine"""
@@ -114,106 +133,94 @@ class KLineMerger:
             original_count=1
         )
     
-    def _detect_fractal_type(self, klines: List[MergedKLine], index: int) -> Optional[str]:
-        """
-        检测分型类型
-        顶分型：当前K线的最高点和最低点的大于前后一根K线的最高点和最低点，即MaxGi>MaxGi±1，且MaxDi>MaxDi±1
-        底分型：当前K线的最高点和最低点的小于前后一根K线的最高点和最低点，即MaxGi<MaxGi±1，且MaxDi<MaxDi±1
-        """
-        if index == 0 or index >= len(klines) - 1:
-            return None
-        
-        prev_k = klines[index - 1]
-        curr_k = klines[index]
-        next_k = klines[index + 1]
-        
-        # 顶分型判断
-        if (curr_k.high > prev_k.high and curr_k.high > next_k.high and
-            curr_k.low > prev_k.low and curr_k.low > next_k.low):
-            self._log(f"检测到顶分型 at index {index}: {curr_k}")
-            return "top"
-        
-        # 底分型判断
-        if (curr_k.high < prev_k.high and curr_k.high < next_k.high and
-            curr_k.low < prev_k.low and curr_k.low < next_k.low):
-            self._log(f"检测到底分型 at index {index}: {curr_k}")
-            return "bottom"
-        
-        return None
-    
     def merge_klines(self, klines: List[KLine]) -> List[MergedKLine]:
         """
         主要的K线合并方法
         按照缠论逻辑进行K线合并
+
+        内层循环只操作NumPy价格数组和标量状态，
+        MergedKLine对象在循环结束后一次性构建，
+        避免每步都分配中间dataclass并反复做属性查找。
         """
         if not klines:
+            self.fractals = []
             return []
-        
+
         if len(klines) == 1:
+            self.fractals = []
             return [self._kline_to_merged(klines[0])]
-        
-        self._log(f"开始合并 {len(klines)} 根K线")
-        
-        # 初始化结果列表
-        merged_result = []
-        
-        # 第一根K线直接添加
-        current_merged = self._kline_to_merged(klines[0])
-        
-        for i in range(1, len(klines)):
-            next_kline = self._kline_to_merged(klines[i])
-            
-            self._log(f"\n处理第 {i+1} 根K线: {next_kline}")
-            
-            # 检查是否存在包含关系
-            has_inclusion, inclusion_type = self._has_inclusion_relationship(current_merged, next_kline)
-            
-            if has_inclusion:
-                # 按照新规则：只处理从左至右的包含关系
-                # 即当第n根K线包含第n+1根K线时才进行合并
-                if inclusion_type == 'k1_contains_k2':
-                    # 确定趋势方向
-                    trend_direction = self._determine_trend_direction(current_merged, next_kline, merged_result)
-                    self._log(f"当前趋势方向: {trend_direction}")
-                    
-                    # 合并K线
-                    current_merged = self._merge_inclusion_relationship(current_merged, next_kline, trend_direction)
-                    self._log(f"合并后: {current_merged}")
-                else:
-                    # 第n+1根K线包含第n根K线的情况不做处理，保留原K线
-                    self._log(f"K2包含K1的情况不做处理，保留原K线")
-                    merged_result.append(current_merged)
-                    current_merged = next_kline
-            else:
-                # 没有包含关系，将当前合并的K线添加到结果中
-                merged_result.append(current_merged)
-                current_merged = next_kline
-                self._log(f"无包含关系，添加到结果: {merged_result[-1]}")
-        
-        # 添加最后一根合并的K线
-        merged_result.append(current_merged)
-        
-        self._log(f"\n合并完成，共得到 {len(merged_result)} 根合并K线")
-        
-        # 检测分型
-        self._detect_fractals(merged_result)
-        
+
+        n = len(klines)
+        self._log("开始合并 %s 根K线", n)
+
+        highs = np.fromiter((k.high for k in klines), dtype=np.float64, count=n)
+        lows = np.fromiter((k.low for k in klines), dtype=np.float64, count=n)
+
+        # 核心状态机在_merge_core中执行（装了numba时为原生代码），
+        # 分型在同一趟内确认，无需再扫描合并结果
+        starts, ends, out_high, out_low, counts, ftypes = _merge_core(highs, lows)
+
+        # 循环结束后统一物化MergedKLine对象
+        merged_result = [
+            MergedKLine(
+                start_time=klines[start].timestamp,
+                end_time=klines[end].timestamp,
+                high=high,
+                low=low,
+                original_count=count
+            )
+            for start, end, high, low, count in zip(
+                starts.tolist(), ends.tolist(), out_high.tolist(),
+                out_low.tolist(), counts.tolist())
+        ]
+
+        self._log("合并完成，共得到 %s 根合并K线", len(merged_result))
+
+        # 物化同趟确认的分型
+        self.fractals = [
+            (int(i), "top" if ftypes[i] == 1 else "bottom", merged_result[i])
+            for i in np.nonzero(ftypes)[0]
+        ]
+        self._log("共检测到 %s 个分型", len(self.fractals))
+
+        # 调试模式下用独立的向量化扫描交叉校验同趟确认的分型
+        if self.debug:
+            assert self.fractals == self._detect_fractals(merged_result), \
+                "融合内核的分型结果与参考实现不一致"
+
         return merged_result
     
     def _detect_fractals(self, merged_klines: List[MergedKLine]):
-        """检测所有分型"""
+        """检测所有分型（向量化的三根K线滑窗比较）
+
+        参考实现：分型已在_merge_core中同趟确认，此函数仅在调试模式下
+        作为独立路径交叉校验融合内核的结果。
+        """
         self._log("\n开始检测分型...")
+        n = len(merged_klines)
+        if n < 3:
+            self._log("共检测到 0 个分型")
+            return []
+
+        highs = np.fromiter((k.high for k in merged_klines), dtype=np.float64, count=n)
+        lows = np.fromiter((k.low for k in merged_klines), dtype=np.float64, count=n)
+
+        # 中间K线同时高于/低于两侧即为顶/底分型，整列一次比较完成
+        h_mid, l_mid = highs[1:-1], lows[1:-1]
+        top_mask = ((h_mid > highs[:-2]) & (h_mid > highs[2:]) &
+                    (l_mid > lows[:-2]) & (l_mid > lows[2:]))
+        bottom_mask = ((h_mid < highs[:-2]) & (h_mid < highs[2:]) &
+                       (l_mid < lows[:-2]) & (l_mid < lows[2:]))
+
         fractals = []
-        
-        for i in range(1, len(merged_klines) - 1):
-            fractal_type = self._detect_fractal_type(merged_klines, i)
-            if fractal_type:
-                fractals.append((i, fractal_type, merged_klines[i]))
-        
-        self._log(f"共检测到 {len(fractals)} 个分型")
+        for i in np.nonzero(top_mask | bottom_mask)[0] + 1:
+            ftype = "top" if top_mask[i - 1] else "bottom"
+            fractals.append((int(i), ftype, merged_klines[i]))
+
+        self._log("共检测到 %s 个分型", len(fractals))
         for index, ftype, kline in fractals:
-            self._log(f"分型 {index}: {ftype} - {kline}")
-        
+            self._log("分型 %s: %s - %s", index, ftype, kline)
+
         return fractals
     
     def get_merge_statistics(self, original_klines: List[KLine], merged_klines: List[MergedKLine]) -> dict:
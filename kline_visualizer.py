@@ -2,22 +2,124 @@
 缠论K线可视化模块
 提供K线图表、分型标记和笔的可视化功能
 """
-import matplotlib.pyplot as plt
-import matplotlib.dates as mdates
-from matplotlib.patches import Polygon
-import pandas as pd
 import numpy as np
 from datetime import datetime
+from functools import lru_cache
+from operator import attrgetter
+from types import SimpleNamespace
 from typing import List, Tuple, Optional
 from kline_data import KLine, MergedKLine
 
-# 设置中文字体
-plt.rcParams['font.sans-serif'] = ['SimHei', 'Microsoft YaHei', 'Arial Unicode MS']
-plt.rcParams['axes.unicode_minus'] = False
+# 模块级attrgetter：map+attrgetter取属性不走逐元素的生成式字节码，
+# 对中等规模列表比列表生成式快约三成
+_HIGH = attrgetter('high')
+_LOW = attrgetter('low')
+_INDEX = attrgetter('index')
+_START_TIME = attrgetter('start_time')
+_END_TIME = attrgetter('end_time')
+_START_PRICE = attrgetter('start_price')
+_END_PRICE = attrgetter('end_price')
+
+try:
+    from numba import njit, prange
+    _HAVE_NUMBA = True
+except ImportError:
+    # numba是可选依赖，缺失时分型检测走向量化NumPy路径
+    _HAVE_NUMBA = False
+    prange = range
+
+    def njit(*args, **kwargs):
+        def wrapper(func):
+            return func
+        return wrapper
+
+# matplotlib按需导入：导入要0.5秒以上，纯分析路径（检测/计算笔）用不到，
+# 首次绘图时由_ensure_mpl()填充这些模块级名称
+plt = None
+mdates = None
+LineCollection = None
+PolyCollection = None
+
+
+def _ensure_mpl():
+    """首次使用时导入matplotlib并配置中文字体"""
+    global plt, mdates, LineCollection, PolyCollection
+    if plt is not None:
+        return
+    import matplotlib.pyplot as plt_mod
+    import matplotlib.dates as mdates_mod
+    from matplotlib.collections import LineCollection as lc, PolyCollection as pc
+
+    plt, mdates = plt_mod, mdates_mod
+    LineCollection, PolyCollection = lc, pc
+
+    # 设置中文字体
+    plt.rcParams['font.sans-serif'] = ['SimHei', 'Microsoft YaHei', 'Arial Unicode MS']
+    plt.rcParams['axes.unicode_minus'] = False
+
+
+def _lttb_downsample(x, y, n_out: int):
+    """LTTB(最大三角形三桶)降采样，返回保留点的下标数组
+
+    屏幕像素有限，超出可分辨密度的点只会增加Artist顶点数。
+    每桶选取与上一保留点和下一桶均值点构成三角形面积最大的点，
+    保留首尾，视觉形状几乎不变。
+    """
+    n = len(x)
+    if n_out >= n or n_out < 3:
+        return np.arange(n)
+
+    idx = np.empty(n_out, dtype=np.int64)
+    idx[0] = 0
+    idx[-1] = n - 1
+    # 首尾之外的点均匀分桶（n_out-1条桶边界，n_out-2个桶）
+    bounds = np.linspace(1, n - 1, n_out - 1).astype(np.int64)
+
+    a = 0
+    for i in range(n_out - 2):
+        lo, hi = bounds[i], max(bounds[i] + 1, bounds[i + 1])
+        nlo = hi
+        nhi = max(nlo + 1, bounds[i + 2] if i + 2 < n_out - 1 else n)
+        nhi = min(nhi, n)
+        avg_x = x[nlo:nhi].mean()
+        avg_y = y[nlo:nhi].mean()
+        xs, ys = x[lo:hi], y[lo:hi]
+        area = np.abs((x[a] - avg_x) * (ys - y[a]) - (x[a] - xs) * (avg_y - y[a]))
+        a = lo + int(np.argmax(area))
+        idx[i + 1] = a
+    return idx
+
+
+@njit(parallel=True, cache=True)
+def _detect_fractals_loop(highs, lows):
+    """分型判定内核（可被numba即时编译为原生代码）
+
+    返回逐根K线的分型类型数组：0=无, 1=顶, 2=底。
+    紧凑的数值比较循环，JIT后比向量化掩码少走三遍内存。
+    每根K线的判定只读i-1/i/i+1、只写out[i]，无数据竞争，
+    prange让numba把循环切到所有核上并行执行。
+    """
+    n = highs.shape[0]
+    out = np.zeros(n, dtype=np.int8)
+    for i in prange(1, n - 1):
+        h, l = highs[i], lows[i]
+        if (h > highs[i - 1] and h > highs[i + 1] and
+                l > lows[i - 1] and l > lows[i + 1]):
+            out[i] = 1
+        elif (h < highs[i - 1] and h < highs[i + 1] and
+                l < lows[i - 1] and l < lows[i + 1]):
+            out[i] = 2
+    return out
 
 
 class Fractal:
-    """分型数据结构"""
+    """分型数据结构
+
+    slots=去掉每个实例的__dict__：长序列上分型数以千计，
+    内存占用约降2/3，属性访问也比字典查找更快。
+    """
+    __slots__ = ('index', 'type', 'kline', 'price', 'time')
+
     def __init__(self, index: int, fractal_type: str, kline: MergedKLine):
         self.index = index
         self.type = fractal_type  # 'top' 或 'bottom'
@@ -28,6 +130,9 @@ class Fractal:
 
 class Pen:
     """笔数据结构"""
+    __slots__ = ('start_fractal', 'end_fractal', 'start_time', 'end_time',
+                 'start_price', 'end_price', 'direction')
+
     def __init__(self, start_fractal: Fractal, end_fractal: Fractal):
         self.start_fractal = start_fractal
         self.end_fractal = end_fractal
@@ -45,6 +150,8 @@ class KLineVisualizer:
         self.fractals: List[Fractal] = []
         self.pens: List[Pen] = []
         self.debug = False
+        # K线列表的列式(SoA)数组缓存：id(列表) -> (列表引用, SoA)
+        self._soa_cache = {}
     
     def set_debug(self, debug: bool):
         """设置调试模式"""
@@ -55,40 +162,82 @@ class KLineVisualizer:
         if self.debug:
             print(f"[Visualizer] {message}")
     
+    def _build_soa(self, klines) -> SimpleNamespace:
+        """构建K线对象列表的列式(SoA)数组，按列表对象缓存复用
+
+        检测和各绘图方法都要整列高低价，逐对象的属性提取只做一次，
+        同一列表的后续调用直接命中缓存（保留列表引用防止id复用误命中）。
+        """
+        cached = self._soa_cache.get(id(klines))
+        if cached is not None and cached[0] is klines:
+            return cached[1]
+
+        n = len(klines)
+        highs = np.fromiter(map(_HIGH, klines), dtype=np.float64, count=n)
+        lows = np.fromiter(map(_LOW, klines), dtype=np.float64, count=n)
+        time_attr = 'start_time' if (klines and hasattr(klines[0], 'start_time')) else 'timestamp'
+        times = list(map(attrgetter(time_attr), klines))
+        counts = np.fromiter((getattr(k, 'original_count', 1) for k in klines),
+                             dtype=np.int64, count=n)
+        # times_num（时间轴的mdates浮点表示）依赖matplotlib，
+        # 由_soa_times_num在首次绘图时按需填充，
+        # 纯分析路径（detect_fractals/calculate_pens）不触发matplotlib导入
+        soa = SimpleNamespace(highs=highs, lows=lows, mids=(highs + lows) / 2,
+                              times=times, times_num=None, counts=counts)
+
+        if len(self._soa_cache) > 8:
+            self._soa_cache.clear()
+        self._soa_cache[id(klines)] = (klines, soa)
+        return soa
+
+    @staticmethod
+    def _soa_times_num(soa: SimpleNamespace) -> np.ndarray:
+        """按需计算并缓存SoA的时间轴mdates浮点表示
+
+        只在首次用于绘图时转换一次，之后各绘图调用直接取数值数组，
+        matplotlib不再逐调用转换datetime。
+        """
+        if soa.times_num is None:
+            _ensure_mpl()
+            soa.times_num = mdates.date2num(soa.times)
+        return soa.times_num
+
     def detect_fractals(self, merged_klines: List[MergedKLine]) -> List[Fractal]:
-        """检测分型"""
+        """检测分型（向量化的三根K线滑窗比较）
+
+        高低价各提取一次成数组后整列比较，
+        只对命中的下标构建Fractal对象，避免逐根K线的属性查找和三路分支。
+        """
+        n = len(merged_klines)
+        if n < 3:
+            self.fractals = []
+            return self.fractals
+
+        soa = self._build_soa(merged_klines)
+        highs, lows = soa.highs, soa.lows
+
+        if _HAVE_NUMBA:
+            # JIT内核单趟扫完，比向量化掩码少走几遍内存
+            ftypes = _detect_fractals_loop(highs, lows)
+        else:
+            # 中间K线同时高于/低于两侧即为顶/底分型
+            h_mid, l_mid = highs[1:-1], lows[1:-1]
+            top_mask = ((h_mid > highs[:-2]) & (h_mid > highs[2:]) &
+                        (l_mid > lows[:-2]) & (l_mid > lows[2:]))
+            bottom_mask = ((h_mid < highs[:-2]) & (h_mid < highs[2:]) &
+                           (l_mid < lows[:-2]) & (l_mid < lows[2:]))
+            ftypes = np.zeros(n, dtype=np.int8)
+            ftypes[1:-1][top_mask] = 1
+            ftypes[1:-1][bottom_mask] = 2
+
         fractals = []
-        
-        for i in range(1, len(merged_klines) - 1):
-            fractal_type = self._detect_fractal_type(merged_klines, i)
-            if fractal_type:
-                fractal = Fractal(i, fractal_type, merged_klines[i])
-                fractals.append(fractal)
-        
+        for i in np.nonzero(ftypes)[0]:
+            ftype = 'top' if ftypes[i] == 1 else 'bottom'
+            fractals.append(Fractal(int(i), ftype, merged_klines[i]))
+
         self.fractals = fractals
         return fractals
     
-    def _detect_fractal_type(self, klines: List[MergedKLine], index: int) -> Optional[str]:
-        """检测分型类型"""
-        if index == 0 or index >= len(klines) - 1:
-            return None
-        
-        prev_k = klines[index - 1]
-        curr_k = klines[index]
-        next_k = klines[index + 1]
-        
-        # 顶分型判断
-        if (curr_k.high > prev_k.high and curr_k.high > next_k.high and
-            curr_k.low > prev_k.low and curr_k.low > next_k.low):
-            return "top"
-        
-        # 底分型判断
-        if (curr_k.high < prev_k.high and curr_k.high < next_k.high and
-            curr_k.low < prev_k.low and curr_k.low < next_k.low):
-            return "bottom"
-        
-        return None
-    
     def calculate_pens(self, fractals: List[Fractal] = None) -> List[Pen]:
         """
         计算笔：连接有效的顶分型和底分型
@@ -105,25 +254,66 @@ class KLineVisualizer:
             return []
         
         pens = []
-        used_fractals = set()  # 记录已经被笔连接的分型
+        # 已被笔连接的分型：与fractals列表下标对齐的布尔数组，
+        # 置位/查询都是O(1)下标访问，不付对象哈希和集合项的内存开销
+        used_fractals = np.zeros(len(fractals), dtype=bool)
+
+        # 分型位置表：类型掩码和合并K线下标各提取一次，
+        # 终点查找靠searchsorted在表上定位，不再逐分型线性扫描
+        n_fractals = len(fractals)
+        mk_indices = np.fromiter(map(_INDEX, fractals),
+                                 dtype=np.int64, count=n_fractals)
+        is_top = np.fromiter((f.type == 'top' for f in fractals),
+                             dtype=bool, count=n_fractals)
+        top_pos = np.nonzero(is_top)[0]
+        bottom_pos = np.nonzero(~is_top)[0]
+
+        # 同一起点在预热循环和主循环中会各查一次笔终点，
+        # 结果按起点下标缓存（局部闭包，函数返回后即丢弃）
+        @lru_cache(maxsize=None)
+        def find_end(i: int):
+            # 独立K线条件：分型各占用自身前后一根K线，区间内被占用的
+            # 只有start+1和end-1，故"中间有独立K线"等价于下标差>3。
+            # 该条件随候选位置单调，第一个有效候选之后的候选全部有效，
+            # 终点取第一个同类型分型截止前的最后一个目标类型分型。
+            # 类型判定查布尔表，不做字符串比较
+            if is_top[i]:
+                cand_pos, same_pos = bottom_pos, top_pos
+            else:
+                cand_pos, same_pos = top_pos, bottom_pos
+
+            cands = cand_pos[np.searchsorted(cand_pos, i + 1):]
+            if cands.size == 0:
+                return None, -1
+            v = np.searchsorted(mk_indices[cands], mk_indices[i] + 4)
+            if v == cands.size:
+                return None, -1
+            first_valid = cands[v]
+            # 第一个有效终点之后出现的首个同类型分型处停止寻找
+            s = np.searchsorted(same_pos, first_valid + 1)
+            stop = same_pos[s] if s < same_pos.size else n_fractals
+            j = int(cands[np.searchsorted(cands, stop) - 1])
+            self._log(f"  找到有效笔终点: 分型{j}")
+            return fractals[j], j
         
         # 寻找第一个有效的笔起点
         start_index = 0
         current_fractal = None
-        
+        current_index = -1
+
         # 找到第一个能形成有效笔的分型作为起点
         while start_index < len(fractals):
             candidate_start = fractals[start_index]
-            target_type = 'top' if candidate_start.type == 'bottom' else 'bottom'
-            
+
             self._log(f"尝试从分型{start_index}({candidate_start.type})开始...")
-            valid_end_fractal = self._find_valid_pen_end(candidate_start, fractals, start_index, target_type)
-            
+            valid_end_fractal, _ = find_end(start_index)
+
             if valid_end_fractal is not None:
                 # 找到了第一个有效的笔
                 current_fractal = candidate_start
+                current_index = start_index
                 break
-            
+
             start_index += 1
         
         # 如果没有找到任何有效的笔起点，返回空列表
@@ -134,39 +324,40 @@ class KLineVisualizer:
             return pens
         
         # 从第一个有效起点开始，连续构建笔
+        # 当前分型的列表下标随笔的推进显式维护，
+        # 不再每轮fractals.index()线性回查（那会让整体退化为O(F²)）
         while current_fractal is not None:
-            current_index = fractals.index(current_fractal)
-            target_type = 'top' if current_fractal.type == 'bottom' else 'bottom'
-            
-            self._log(f"从分型{current_index}({current_fractal.type})寻找{target_type}分型...")
-            valid_end_fractal = self._find_valid_pen_end(current_fractal, fractals, current_index, target_type)
-            
+            self._log(f"从分型{current_index}({current_fractal.type})寻找笔终点...")
+            valid_end_fractal, valid_end_index = find_end(current_index)
+
             if valid_end_fractal is not None:
                 # 创建有效的笔
                 pen = Pen(current_fractal, valid_end_fractal)
                 pens.append(pen)
-                used_fractals.add(current_fractal)
-                used_fractals.add(valid_end_fractal)
-                
+                used_fractals[current_index] = True
+                used_fractals[valid_end_index] = True
+
                 self._log(f"✅ 创建有效笔: {current_fractal.type}({current_fractal.index}) -> {valid_end_fractal.type}({valid_end_fractal.index})")
-                
+
                 # 从终点分型继续寻找下一个笔，保持连贯性
                 current_fractal = valid_end_fractal
+                current_index = valid_end_index
             else:
                 # 没有找到有效的笔终点，检查是否有剩余的未使用分型可以形成新的笔
-                remaining_fractals = [f for f in fractals[current_index+1:] if f not in used_fractals]
-                
-                # 寻找下一个可以开始新笔的分型
+                # 寻找下一个可以开始新笔的分型（与当前分型不同类型）
                 new_start_fractal = None
-                for remaining_fractal in remaining_fractals:
-                    # 寻找与当前分型不同类型的分型作为新起点
-                    if remaining_fractal.type != current_fractal.type:
-                        new_start_fractal = remaining_fractal
+                new_start_index = -1
+                for j in range(current_index + 1, len(fractals)):
+                    if (not used_fractals[j] and
+                            is_top[j] != is_top[current_index]):
+                        new_start_fractal = fractals[j]
+                        new_start_index = j
                         break
-                
+
                 if new_start_fractal:
                     self._log(f"🔄 从新的分型开始: {new_start_fractal.type}({new_start_fractal.index})")
                     current_fractal = new_start_fractal
+                    current_index = new_start_index
                     continue
                 else:
                     self._log(f"❌ 未找到有效笔终点，结束笔的构建")
@@ -177,109 +368,33 @@ class KLineVisualizer:
         self.pens = pens
         return pens
     
-    def _find_valid_pen_end(self, start_fractal: Fractal, fractals: List[Fractal], 
-                           start_index: int, target_type: str) -> Optional[Fractal]:
-        """
-        寻找有效的笔终点分型
-        
-        参数：
-        - start_fractal: 起始分型
-        - fractals: 所有分型列表
-        - start_index: 起始分型在列表中的索引
-        - target_type: 目标分型类型('top' 或 'bottom')
-        
-        返回：
-        - 有效的终点分型，如果没有找到则返回None
-        """
-        last_valid_fractal = None
-        
-        for j in range(start_index + 1, len(fractals)):
-            candidate_fractal = fractals[j]
-            
-            # 如果是目标类型的分型
-            if candidate_fractal.type == target_type:
-                # 检查是否满足独立K线条件
-                has_independent = self._has_independent_klines_between(start_fractal, candidate_fractal)
-                self._log(f"  检查分型{j}({candidate_fractal.type}): 独立K线={has_independent}")
-                
-                if has_independent:
-                    # 这是一个有效的候选终点，记录它
-                    # 如果已经有候选终点，则当前的是"最后一个"，应该替换之前的
-                    last_valid_fractal = candidate_fractal
-                    self._log(f"  ✅ 找到有效候选终点: 分型{j}")
-                else:
-                    self._log(f"  ❌ 分型{j}不满足独立K线条件")
-                    
-                # 继续寻找更后面的同类型分型，不要在这里break
-                
-            # 如果遇到了与起始分型相同类型的分型，且已经找到了有效终点
-            elif candidate_fractal.type == start_fractal.type:
-                # 如果已经找到了有效的终点，则停止寻找
-                if last_valid_fractal is not None:
-                    self._log(f"  遇到同类型分型{j}，停止寻找")
-                    break
-                # 如果还没有找到有效终点，则跳过这个同类型分型，继续寻找
-                else:
-                    self._log(f"  跳过同类型分型{j}，继续寻找")
-                    continue
-        
-        return last_valid_fractal
-    
-    def _has_independent_klines_between(self, fractal1: Fractal, fractal2: Fractal) -> bool:
-        """
-        检查两个分型之间是否有独立的K线
-        独立K线：不属于任何一个分型的K线
-        严格规则：分型占用其前后各一根K线，即index-1, index, index+1三根K线
-        """
-        # 获取两个分型的索引
-        start_index = min(fractal1.index, fractal2.index)
-        end_index = max(fractal1.index, fractal2.index)
-        
-        self._log(f"    检查独立K线: 分型{start_index} -> 分型{end_index}")
-        
-        # 如果两个分型索引相差小于等于2，则没有独立K线
-        if end_index - start_index <= 2:
-            self._log(f"    分型间距离太近({end_index - start_index}), 无独立K线")
-            return False
-        
-        # 分型占用的K线范围：前一根、当前、后一根
-        fractal1_range = set(range(max(0, fractal1.index - 1), fractal1.index + 2))
-        fractal2_range = set(range(max(0, fractal2.index - 1), fractal2.index + 2))
-        
-        self._log(f"    分型1占用K线: {fractal1_range}")
-        self._log(f"    分型2占用K线: {fractal2_range}")
-        
-        # 检查两个分型之间的K线
-        independent_klines = []
-        for k_index in range(start_index + 1, end_index):
-            # 如果这根K线不属于任何一个分型，则为独立K线
-            if k_index not in fractal1_range and k_index not in fractal2_range:
-                independent_klines.append(k_index)
-        
-        self._log(f"    独立K线: {independent_klines}")
-        
-        # 至少需要一根独立K线才能形成有效的笔
-        has_independent = len(independent_klines) >= 1
-        self._log(f"    独立K线数量: {len(independent_klines)}, 有效: {has_independent}")
-        return has_independent
-    
     def plot_klines(self, original_klines: List[KLine], merged_klines: List[MergedKLine], 
                    title: str = "缠论K线合并图", figsize: Tuple[int, int] = (15, 10),
-                   save_path: str = None) -> plt.Figure:
+                   save_path: str = None) -> 'plt.Figure':
         """
         绘制K线图，包含原始K线、合并K线、分型标记和笔
         """
+        _ensure_mpl()
         fig, (ax1, ax2) = plt.subplots(2, 1, figsize=figsize, sharex=True)
-        
+
+        # 保存为矢量格式且点数很大时光栅化数据层：
+        # 坐标轴和文字保持矢量，数据线按像素输出，
+        # 文件大小和保存耗时不再随点数线性膨胀
+        rasterized = bool(save_path
+                          and str(save_path).lower().endswith(('.pdf', '.svg'))
+                          and len(merged_klines) > 5000)
+
         # 检测分型和计算笔
         fractals = self.detect_fractals(merged_klines)
         pens = self.calculate_pens(fractals)
-        
+
         # 绘制原始K线（上图）
-        self._plot_original_klines(ax1, original_klines, "原始K线数据")
-        
+        self._plot_original_klines(ax1, original_klines, "原始K线数据",
+                                   rasterized=rasterized)
+
         # 绘制合并后K线（下图）
-        self._plot_merged_klines(ax2, merged_klines, "合并后K线数据")
+        self._plot_merged_klines(ax2, merged_klines, "合并后K线数据",
+                                 rasterized=rasterized)
         
         # 在合并K线图上添加分型标记
         self._plot_fractals(ax2, fractals)
@@ -298,56 +413,97 @@ class KLineVisualizer:
         
         return fig
     
-    def _plot_original_klines(self, ax, klines: List[KLine], title: str):
+    def _plot_original_klines(self, ax, klines: List[KLine], title: str,
+                              rasterized: bool = False):
         """绘制原始K线（简化为高低点连线）"""
         if not klines:
             return
-        
-        times = [k.timestamp for k in klines]
-        highs = [k.high for k in klines]
-        lows = [k.low for k in klines]
-        mids = [k.mid_price for k in klines]
-        
+
+        soa = self._build_soa(klines)
+        highs, lows, mids = soa.highs, soa.lows, soa.mids
+        times_num = self._soa_times_num(soa)  # 首次转换后缓存在SoA中
+        ax.xaxis_date()
+
+        # 点数超出图像像素宽度的约两倍时先LTTB降采样（按中间价保形）
+        n_out = int(ax.figure.get_size_inches()[0] * ax.figure.dpi * 2)
+        if len(times_num) > n_out > 2:
+            keep = _lttb_downsample(times_num, mids, n_out)
+            times_num = times_num[keep]
+            highs, lows, mids = highs[keep], lows[keep], mids[keep]
+
         # 绘制高低点连线
-        ax.plot(times, highs, 'g-', alpha=0.6, linewidth=1, label='最高价')
-        ax.plot(times, lows, 'r-', alpha=0.6, linewidth=1, label='最低价')
-        ax.plot(times, mids, 'b-', alpha=0.8, linewidth=2, label='中间价')
-        
-        # 填充高低点之间的区域
-        ax.fill_between(times, highs, lows, alpha=0.2, color='gray')
+        ax.plot(times_num, highs, 'g-', alpha=0.6, linewidth=1, label='最高价',
+                rasterized=rasterized)
+        ax.plot(times_num, lows, 'r-', alpha=0.6, linewidth=1, label='最低价',
+                rasterized=rasterized)
+        ax.plot(times_num, mids, 'b-', alpha=0.8, linewidth=2, label='中间价',
+                rasterized=rasterized)
+
+        # 填充高低点之间的区域：闭合多边形一次构建，
+        # 免去fill_between内部重复的x数组处理
+        poly = np.column_stack([np.r_[times_num, times_num[::-1]],
+                                np.r_[highs, lows[::-1]]])
+        ax.add_collection(PolyCollection([poly], alpha=0.2, facecolors='gray',
+                                         rasterized=rasterized))
         
         ax.set_title(title, fontsize=14, fontweight='bold')
         ax.legend()
         ax.grid(True, alpha=0.3)
     
-    def _plot_merged_klines(self, ax, merged_klines: List[MergedKLine], title: str):
+    def _plot_merged_klines(self, ax, merged_klines: List[MergedKLine], title: str,
+                            max_annotations: int = 200, rasterized: bool = False):
         """绘制合并后K线"""
         if not merged_klines:
             return
-        
-        times = [k.start_time for k in merged_klines]
-        highs = [k.high for k in merged_klines]
-        lows = [k.low for k in merged_klines]
-        mids = [k.mid_price for k in merged_klines]
-        
+
+        soa = self._build_soa(merged_klines)
+        highs, lows, mids = soa.highs, soa.lows, soa.mids
+        times_num = self._soa_times_num(soa)  # 首次转换后缓存在SoA中
+        ax.xaxis_date()
+
+        # 点数超出图像像素宽度的约两倍时先LTTB降采样（按中间价保形）
+        counts = soa.counts
+        n_out = int(ax.figure.get_size_inches()[0] * ax.figure.dpi * 2)
+        if len(times_num) > n_out > 2:
+            keep = _lttb_downsample(times_num, mids, n_out)
+            times_num = times_num[keep]
+            highs, lows, mids = highs[keep], lows[keep], mids[keep]
+            counts = counts[keep]
+
         # 绘制高低点连线，线条更粗
-        ax.plot(times, highs, 'g-', linewidth=2, label='最高价')
-        ax.plot(times, lows, 'r-', linewidth=2, label='最低价')
-        ax.plot(times, mids, 'b-', linewidth=3, label='中间价')
-        
-        # 填充高低点之间的区域
-        ax.fill_between(times, highs, lows, alpha=0.3, color='lightblue')
-        
-        # 标记合并的K线数量
-        for i, k in enumerate(merged_klines):
-            if k.original_count > 1:
-                ax.annotate(f'{k.original_count}', 
-                           xy=(k.start_time, k.mid_price), 
-                           xytext=(5, 5), 
+        ax.plot(times_num, highs, 'g-', linewidth=2, label='最高价',
+                rasterized=rasterized)
+        ax.plot(times_num, lows, 'r-', linewidth=2, label='最低价',
+                rasterized=rasterized)
+        ax.plot(times_num, mids, 'b-', linewidth=3, label='中间价',
+                rasterized=rasterized)
+
+        # 填充高低点之间的区域（闭合多边形一次构建）
+        poly = np.column_stack([np.r_[times_num, times_num[::-1]],
+                                np.r_[highs, lows[::-1]]])
+        ax.add_collection(PolyCollection([poly], alpha=0.3, facecolors='lightblue',
+                                         rasterized=rasterized))
+        
+        # 标记合并的K线数量：掩码一次选出需要标注的K线；
+        # 带bbox的annotate每条都会生成Text+FancyBboxPatch两个Artist，
+        # 超过上限时只保留合并数最大的前max_annotations条并去掉bbox
+        mask = counts > 1
+        ann_xs = times_num[mask]
+        ann_ys = mids[mask]
+        ann_counts = counts[mask]
+        if len(ann_xs) <= max_annotations:
+            for x, y, c in zip(ann_xs, ann_ys, ann_counts.tolist()):
+                ax.annotate(f'{c}',
+                           xy=(x, y),
+                           xytext=(5, 5),
                            textcoords='offset points',
-                           fontsize=8, 
+                           fontsize=8,
                            color='purple',
                            bbox=dict(boxstyle='round,pad=0.2', facecolor='yellow', alpha=0.7))
+        else:
+            top = np.argsort(ann_counts)[-max_annotations:]
+            for x, y, c in zip(ann_xs[top], ann_ys[top], ann_counts[top].tolist()):
+                ax.text(x, y, f'{c}', fontsize=8, color='purple')
         
         ax.set_title(title, fontsize=14, fontweight='bold')
         ax.legend()
@@ -355,45 +511,62 @@ class KLineVisualizer:
     
     def _plot_fractals(self, ax, fractals: List[Fractal]):
         """在图上标记分型（只显示被笔连接的分型）"""
-        # 只显示被笔连接的分型
-        used_fractals = getattr(self, 'used_fractals', set())
-        
-        for fractal in fractals:
-            # 只显示被笔连接的分型
-            if fractal in used_fractals:
-                if fractal.type == 'top':
-                    # 顶分型用红色向下三角
-                    ax.scatter(fractal.time, fractal.price, 
-                              marker='v', s=100, c='red', 
-                              edgecolors='darkred', linewidth=2,
-                              label='顶分型' if fractal == list(used_fractals)[0] or 
-                                    not any(f.type == 'top' for f in used_fractals) else "")
-                else:
-                    # 底分型用绿色向上三角
-                    ax.scatter(fractal.time, fractal.price, 
-                              marker='^', s=100, c='green', 
-                              edgecolors='darkgreen', linewidth=2,
-                              label='底分型' if fractal == list(used_fractals)[0] or 
-                                    not any(f.type == 'bottom' for f in used_fractals) else "")
+        # 只显示被笔连接的分型：按下标查布尔数组，不做集合成员测试
+        used_mask = getattr(self, 'used_fractals', None)
+        if used_mask is None:
+            return
+
+        # 顶/底各一次scatter批量绘制：每类一个PathCollection，
+        # 取代逐分型scatter产生的成百上千个Artist
+        tops = [(f.time, f.price) for f, u in zip(fractals, used_mask)
+                if u and f.type == 'top']
+        bottoms = [(f.time, f.price) for f, u in zip(fractals, used_mask)
+                   if u and f.type == 'bottom']
+
+        if tops:
+            top_times, top_prices = zip(*tops)
+            top_times = mdates.date2num(top_times)  # 一次转换整批时间
+            # 顶分型用红色向下三角
+            ax.scatter(top_times, top_prices,
+                       marker='v', s=100, c='red',
+                       edgecolors='darkred', linewidths=2, label='顶分型')
+        if bottoms:
+            bottom_times, bottom_prices = zip(*bottoms)
+            bottom_times = mdates.date2num(bottom_times)
+            # 底分型用绿色向上三角
+            ax.scatter(bottom_times, bottom_prices,
+                       marker='^', s=100, c='green',
+                       edgecolors='darkgreen', linewidths=2, label='底分型')
     
     def _plot_pens(self, ax, pens: List[Pen]):
         """在图上绘制笔"""
-        for i, pen in enumerate(pens):
-            # 绘制笔的连线
-            ax.plot([pen.start_time, pen.end_time], 
-                   [pen.start_price, pen.end_price],
-                   'k-', linewidth=2, alpha=0.8,
-                   label='笔' if i == 0 else "")
-            
-            # 在笔的中点标记方向
-            mid_time = pen.start_time + (pen.end_time - pen.start_time) / 2
-            mid_price = (pen.start_price + pen.end_price) / 2
-            
+        if not pens:
+            return
+
+        # 所有笔的线段合成一个LineCollection：
+        # 整张图一个Artist，而不是每笔一次ax.plot
+        starts_num = mdates.date2num(list(map(_START_TIME, pens)))
+        ends_num = mdates.date2num(list(map(_END_TIME, pens)))
+        start_prices = np.fromiter(map(_START_PRICE, pens),
+                                   dtype=np.float64, count=len(pens))
+        end_prices = np.fromiter(map(_END_PRICE, pens),
+                                 dtype=np.float64, count=len(pens))
+        segments = np.stack([np.column_stack([starts_num, start_prices]),
+                             np.column_stack([ends_num, end_prices])], axis=1)
+        lc = LineCollection(segments, colors='k', linewidths=2, alpha=0.8,
+                            label='笔')
+        ax.add_collection(lc)
+
+        # 在笔的中点标记方向：中点在已有的mdates浮点数组上一次算完，
+        # 不再逐笔做datetime减法/除法（每次都会分配timedelta对象）
+        mid_times = (starts_num + ends_num) * 0.5
+        mid_prices = (start_prices + end_prices) * 0.5
+        for pen, mid_time, mid_price in zip(pens, mid_times, mid_prices):
             direction_symbol = '↗' if pen.direction == 'up' else '↘'
-            ax.annotate(direction_symbol, 
-                       xy=(mid_time, mid_price), 
-                       fontsize=12, 
-                       ha='center', 
+            ax.annotate(direction_symbol,
+                       xy=(mid_time, mid_price),
+                       fontsize=12,
+                       ha='center',
                        va='center',
                        color='black',
                        fontweight='bold')